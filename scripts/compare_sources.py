@@ -13,33 +13,50 @@ import pandas as pd
 BASE_DIR = Path(__file__).parent.parent
 PROCESSED_DIR = BASE_DIR / "data" / "processed"
 
+# 比對會用到的欄位直接指定型別，讀取時跳過整欄型別推斷
+DTYPES = {
+    "事業單位": "string",
+    "發生日期": "string",
+    "災害類型": "string",
+    "年度": "string",
+}
+
+
+def _read_processed(csv_file: Path) -> pd.DataFrame:
+    """讀取處理後資料，優先使用 Parquet 版本（若存在）"""
+    parquet_file = csv_file.with_suffix(".parquet")
+    if parquet_file.exists():
+        return pd.read_parquet(parquet_file, dtype_backend="pyarrow")
+
+    # pyarrow 引擎多執行緒解析，轉 pandas 時多數欄位零複製
+    return pd.read_csv(
+        csv_file,
+        encoding="utf-8-sig",
+        engine="pyarrow",
+        dtype=DTYPES,
+        dtype_backend="pyarrow",
+    )
+
 
 def load_data():
     """載入兩個資料來源"""
-    pacs_file = PROCESSED_DIR / "重大職業災害_2018至今.csv"
-    mol_file = PROCESSED_DIR / "重大職業災害_MOL_WEBSERVICES.csv"
+    pacs_df = _read_processed(PROCESSED_DIR / "重大職業災害_2018至今.csv")
+    mol_df = _read_processed(PROCESSED_DIR / "重大職業災害_MOL_WEBSERVICES.csv")
 
-    pacs_df = pd.read_csv(pacs_file, encoding="utf-8-sig")
-    mol_df = pd.read_csv(mol_file, encoding="utf-8-sig")
+    # 一次算好標準化欄位，後續比對函式直接使用，不再各自 copy 整個 DataFrame
+    for df in (pacs_df, mol_df):
+        df["年度_標準"] = normalize_year(df["年度"])
+        df["日期_標準"] = normalize_date(df["發生日期"])
 
     return pacs_df, mol_df
 
 
-def normalize_year(year_val):
-    """將年度統一為西元年"""
-    if pd.isna(year_val):
-        return None
-    year_str = str(year_val).strip()
-    if year_str in ["最新", "latest"]:
-        return 2025
-    try:
-        year_int = int(float(year_str))
-        # 民國年轉西元年
-        if year_int < 200:
-            return year_int + 1911
-        return year_int
-    except ValueError:
-        return None
+def normalize_year(years: pd.Series) -> pd.Series:
+    """將年度欄位統一為西元年（向量化處理整個 Series）"""
+    cleaned = years.astype(str).str.strip().replace({"最新": "2025", "latest": "2025"})
+    numeric = pd.to_numeric(cleaned, errors="coerce")
+    # 民國年轉西元年
+    return numeric.mask(numeric < 200, numeric + 1911).astype("Int64")
 
 
 def compare_counts(pacs_df: pd.DataFrame, mol_df: pd.DataFrame):
@@ -50,42 +67,32 @@ def compare_counts(pacs_df: pd.DataFrame, mol_df: pd.DataFrame):
     print(f"{'年度':<15} {'pacs API':<12} {'MOL WEBSERVICES':<18} {'差異':<10}")
     print("-" * 70)
 
-    # 標準化年度
-    pacs_df = pacs_df.copy()
-    mol_df = mol_df.copy()
-    pacs_df["年度_標準"] = pacs_df["年度"].apply(normalize_year)
-    mol_df["年度_標準"] = mol_df["年度"].apply(normalize_year)
-
     pacs_counts = pacs_df.groupby("年度_標準").size()
     mol_counts = mol_df.groupby("年度_標準").size()
 
-    all_years = sorted(set(pacs_counts.index) | set(mol_counts.index))
-
-    total_pacs = 0
-    total_mol = 0
-
-    for year in all_years:
-        if year is None:
-            continue
-        roc_year = year - 1911
-        pacs_count = pacs_counts.get(year, 0)
-        mol_count = mol_counts.get(year, 0)
-
-        diff = pacs_count - mol_count
-        diff_str = f"+{diff}" if diff > 0 else str(diff) if diff < 0 else "0"
+    # 以 DataFrame 一次完成年度對齊、補零與差異計算，迴圈只負責排版輸出
+    summary = (
+        pd.DataFrame({"pacs": pacs_counts, "mol": mol_counts})
+        .fillna(0)
+        .astype(int)
+        .sort_index()
+    )
+    summary["diff"] = summary["pacs"] - summary["mol"]
 
+    for year, row in summary.iterrows():
+        year = int(year)
+        diff_str = f"+{row['diff']}" if row["diff"] > 0 else str(row["diff"])
         print(
-            f"{int(year)} ({roc_year}年)    {pacs_count:<12} {mol_count:<18} {diff_str:<10}"
+            f"{year} ({year - 1911}年)    {row['pacs']:<12} {row['mol']:<18} {diff_str:<10}"
         )
-        total_pacs += pacs_count
-        total_mol += mol_count
 
+    totals = summary.sum()
     print("-" * 70)
-    print(f"{'總計':<15} {total_pacs:<12} {total_mol:<18} {total_pacs - total_mol:<10}")
+    print(
+        f"{'總計':<15} {totals['pacs']:<12} {totals['mol']:<18} {totals['diff']:<10}"
+    )
     print()
 
-    return pacs_df, mol_df
-
 
 def compare_fields(pacs_df: pd.DataFrame, mol_df: pd.DataFrame):
     """比較欄位差異"""
@@ -93,8 +100,10 @@ def compare_fields(pacs_df: pd.DataFrame, mol_df: pd.DataFrame):
     print("欄位比較")
     print("=" * 70)
 
-    pacs_cols = set(pacs_df.columns)
-    mol_cols = set(mol_df.columns)
+    # 排除 load_data 加入的標準化輔助欄位
+    derived_cols = {"年度_標準", "日期_標準"}
+    pacs_cols = set(pacs_df.columns) - derived_cols
+    mol_cols = set(mol_df.columns) - derived_cols
 
     common = pacs_cols & mol_cols
     pacs_only = pacs_cols - mol_cols
@@ -109,14 +118,11 @@ def compare_fields(pacs_df: pd.DataFrame, mol_df: pd.DataFrame):
     print()
 
 
-def normalize_date(date_val):
-    """標準化日期格式為 YYYYMMDD"""
-    if pd.isna(date_val):
-        return None
-    date_str = str(date_val).strip()
-    # 移除 - 符號
-    date_str = date_str.replace("-", "")
-    return date_str[:8] if len(date_str) >= 8 else date_str
+def normalize_date(dates: pd.Series) -> pd.Series:
+    """標準化日期格式為 YYYYMMDD（向量化處理整個 Series）"""
+    # 移除 - 符號後取前 8 碼
+    cleaned = dates.astype(str).str.strip().str.replace("-", "", regex=False)
+    return cleaned.str.slice(0, 8).where(dates.notna())
 
 
 def find_unique_records(pacs_df: pd.DataFrame, mol_df: pd.DataFrame):
@@ -125,47 +131,36 @@ def find_unique_records(pacs_df: pd.DataFrame, mol_df: pd.DataFrame):
     print("記錄比對（基於事業單位+發生日期）")
     print("=" * 70)
 
-    pacs_df = pacs_df.copy()
-    mol_df = mol_df.copy()
+    # 各自對「對方來源去重後的 key」做 left merge，由 indicator 判斷有無；
+    # 先 drop_duplicates 可避免重複 key 造成 merge 笛卡兒展開
+    key_cols = ["事業單位", "日期_標準"]
+    display_cols = ["事業單位", "發生日期", "災害類型", "年度"]
 
-    # 標準化日期
-    pacs_df["日期_標準"] = pacs_df["發生日期"].apply(normalize_date)
-    mol_df["日期_標準"] = mol_df["發生日期"].apply(normalize_date)
-
-    # 建立唯一識別（事業單位 + 標準化日期）
-    pacs_df["key"] = pacs_df["事業單位"].astype(str) + "_" + pacs_df["日期_標準"].astype(
-        str
+    pacs_tagged = pacs_df[display_cols + ["日期_標準"]].merge(
+        mol_df[key_cols].drop_duplicates(), on=key_cols, how="left", indicator=True
+    )
+    mol_tagged = mol_df[display_cols + ["日期_標準"]].merge(
+        pacs_df[key_cols].drop_duplicates(), on=key_cols, how="left", indicator=True
     )
-    mol_df["key"] = mol_df["事業單位"].astype(str) + "_" + mol_df["日期_標準"].astype(str)
-
-    pacs_keys = set(pacs_df["key"])
-    mol_keys = set(mol_df["key"])
 
-    common_keys = pacs_keys & mol_keys
-    pacs_only = pacs_keys - mol_keys
-    mol_only = mol_keys - pacs_keys
+    pacs_unique = pacs_tagged[pacs_tagged["_merge"] == "left_only"]
+    mol_unique = mol_tagged[mol_tagged["_merge"] == "left_only"]
 
-    print(f"兩者皆有: {len(common_keys)} 筆")
-    print(f"僅 pacs API 有: {len(pacs_only)} 筆")
-    print(f"僅 MOL WEBSERVICES 有: {len(mol_only)} 筆")
+    print(f"兩者皆有: {len(pacs_tagged) - len(pacs_unique)} 筆")
+    print(f"僅 pacs API 有: {len(pacs_unique)} 筆")
+    print(f"僅 MOL WEBSERVICES 有: {len(mol_unique)} 筆")
     print()
 
     # 顯示部分僅 pacs 有的記錄
-    if pacs_only:
+    if len(pacs_unique) > 0:
         print("僅 pacs API 有的前 5 筆記錄:")
-        pacs_unique = pacs_df[pacs_df["key"].isin(list(pacs_only)[:5])][
-            ["事業單位", "發生日期", "災害類型", "年度"]
-        ]
-        print(pacs_unique.to_string(index=False))
+        print(pacs_unique.head(5)[display_cols].to_string(index=False))
         print()
 
     # 顯示部分僅 MOL 有的記錄
-    if mol_only:
+    if len(mol_unique) > 0:
         print("僅 MOL WEBSERVICES 有的前 5 筆記錄:")
-        mol_unique = mol_df[mol_df["key"].isin(list(mol_only)[:5])][
-            ["事業單位", "發生日期", "災害類型", "年度"]
-        ]
-        print(mol_unique.to_string(index=False))
+        print(mol_unique.head(5)[display_cols].to_string(index=False))
 
 
 def main():
@@ -182,7 +177,7 @@ def main():
     print(f"MOL WEBSERVICES 總筆數: {len(mol_df)}")
     print()
 
-    pacs_df, mol_df = compare_counts(pacs_df, mol_df)
+    compare_counts(pacs_df, mol_df)
     compare_fields(pacs_df, mol_df)
     find_unique_records(pacs_df, mol_df)
 
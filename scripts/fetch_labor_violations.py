@@ -7,13 +7,20 @@
 """
 
 import io
-import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import charset_normalizer
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import RateLimiter
 
 # 設定
 BASE_URL = "https://announcement.mol.gov.tw"
@@ -56,6 +63,10 @@ CITY_CODES = {
     "勞動部": "00",
 }
 
+# 下載併發數與請求速率限制（避免對政府網站造成壓力）
+MAX_WORKERS = 6
+_LIMITER = RateLimiter(rate=3, per=1.0)
+
 
 def get_csrf_token(session: requests.Session) -> str:
     """從首頁取得 CSRF token"""
@@ -93,6 +104,8 @@ def download_city_data(
     }
 
     try:
+        # token bucket 限速，取代逐一 sleep
+        _LIMITER.acquire()
         response = session.post(DOWNLOAD_URL, data=data, verify=False, timeout=120)
         response.raise_for_status()
 
@@ -109,9 +122,39 @@ def download_city_data(
         return None
 
 
-def extract_csvs_from_zip(zip_content: bytes, city_name: str) -> list[pd.DataFrame]:
-    """從 ZIP 檔案中提取 CSV"""
-    dfs = []
+def decode_csv(content: bytes) -> str | None:
+    """
+    一次性判斷編碼並解碼 CSV 內容
+
+    先處理 BOM、再嘗試 UTF-8；失敗時以 charset_normalizer 探測前 4 KiB
+    決定 big5/cp950，讓每份內容最多完整解碼一次。無法解碼時回傳 None。
+    """
+    if content.startswith(b"\xef\xbb\xbf"):
+        content = content[3:]
+
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+
+    best = charset_normalizer.from_bytes(content[:4096]).best()
+    for encoding in ([best.encoding] if best else []) + ["cp950"]:
+        try:
+            return content.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+
+    return None
+
+
+def extract_csvs_from_zip(zip_content: bytes, city_name: str) -> list[dict]:
+    """
+    從 ZIP 檔案中提取並清理 CSV
+
+    只做文字層級的清理，不在此建立 DataFrame；回傳各 CSV 的
+    標題列、資料內容與中繼資料，由 main() 合併後一次解析。
+    """
+    parts = []
 
     try:
         with zipfile.ZipFile(io.BytesIO(zip_content)) as zf:
@@ -120,70 +163,113 @@ def extract_csvs_from_zip(zip_content: bytes, city_name: str) -> list[pd.DataFra
                     with zf.open(filename) as f:
                         content = f.read()
 
-                        # 嘗試不同編碼
-                        for encoding in ["utf-8-sig", "utf-8", "big5", "cp950"]:
-                            try:
-                                # 預處理：移除第一行標題，並修復跨行的欄位名稱
-                                text = content.decode(encoding)
-                                lines = text.split("\n")
-
-                                # 跳過 "違反雇主清冊" 標題行
-                                if lines[0].strip().replace('"', "") == "違反雇主清冊":
-                                    lines = lines[1:]
-
-                                # 修復跨行的欄位名稱（欄位名稱內含換行符）
-                                # 標準欄位：編號,縣市／單位別,公告日期,事業單位名稱(負責人)自然人姓名,處分日期,...
-                                fixed_lines = []
-                                i = 0
-                                while i < len(lines):
-                                    line = lines[i]
-                                    # 檢查是否是不完整的行（引號未閉合）
-                                    quote_count = line.count('"')
-                                    while quote_count % 2 != 0 and i + 1 < len(lines):
-                                        i += 1
-                                        line = line + lines[i]
-                                        quote_count = line.count('"')
-                                    fixed_lines.append(line)
-                                    i += 1
-
-                                # 移除尾部多餘的逗號（資料行可能比標題多一欄）
-                                fixed_lines = [
-                                    line.rstrip(",") for line in fixed_lines
-                                ]
-
-                                fixed_text = "\n".join(fixed_lines)
-
-                                df = pd.read_csv(
-                                    io.StringIO(fixed_text),
-                                    on_bad_lines="skip",
-                                )
-
-                                # 確認有資料
-                                if len(df) > 0 and len(df.columns) > 1:
-                                    # 清理欄位名稱中的換行符
-                                    df.columns = [
-                                        col.replace("\n", "").replace("\r", "")
-                                        for col in df.columns
-                                    ]
-                                    df["來源縣市"] = city_name
-                                    df["來源檔案"] = filename
-
-                                    # 判斷分類（A=勞基法等, B=就服法等, C=勞退等）
-                                    if "-A-" in filename:
-                                        df["法規分類"] = "勞動基準法等"
-                                    elif "-B-" in filename:
-                                        df["法規分類"] = "就業服務法等"
-                                    elif "-C-" in filename:
-                                        df["法規分類"] = "勞工退休金條例等"
-
-                                    dfs.append(df)
-                                break
-                            except (UnicodeDecodeError, pd.errors.ParserError):
-                                continue
+                    text = decode_csv(content)
+                    if text is None:
+                        print(f"  警告: {city_name} {filename} 無法解碼")
+                        continue
+
+                    # 預處理：移除第一行標題，並修復跨行的欄位名稱
+                    lines = text.split("\n")
+
+                    # 跳過 "違反雇主清冊" 標題行
+                    if lines[0].strip().replace('"', "") == "違反雇主清冊":
+                        lines = lines[1:]
+
+                    # 修復跨行的欄位名稱（欄位名稱內含換行符）
+                    # 標準欄位：編號,縣市／單位別,公告日期,事業單位名稱(負責人)自然人姓名,處分日期,...
+                    if '"' not in text:
+                        # 快速路徑：全檔無引號時每行即一筆資料，免逐行檢查
+                        fixed_lines = lines
+                    else:
+                        # 慢速路徑：合併引號未閉合的跨行資料，
+                        # 維持「一行一筆」讓 parse_csv_parts 能逐列標記來源
+                        fixed_lines = []
+                        i = 0
+                        while i < len(lines):
+                            line = lines[i]
+                            quote_count = line.count('"')
+                            while quote_count % 2 != 0 and i + 1 < len(lines):
+                                i += 1
+                                line = line + lines[i]
+                                quote_count = line.count('"')
+                            fixed_lines.append(line)
+                            i += 1
+
+                    # 移除尾部多餘的逗號（資料行可能比標題多一欄）
+                    fixed_lines = [line.rstrip(",") for line in fixed_lines]
+
+                    # 確認有資料
+                    header = fixed_lines[0].replace("\r", "") if fixed_lines else ""
+                    body_lines = [ln for ln in fixed_lines[1:] if ln.strip()]
+                    if body_lines and "," in header:
+                        # 判斷分類（A=勞基法等, B=就服法等, C=勞退等）
+                        if "-A-" in filename:
+                            category = "勞動基準法等"
+                        elif "-B-" in filename:
+                            category = "就業服務法等"
+                        elif "-C-" in filename:
+                            category = "勞工退休金條例等"
+                        else:
+                            category = None
+
+                        parts.append(
+                            {
+                                "header": header,
+                                "body": "\n".join(body_lines),
+                                "rows": len(body_lines),
+                                "city": city_name,
+                                "filename": filename,
+                                "category": category,
+                            }
+                        )
     except zipfile.BadZipFile:
         print(f"  警告: {city_name} ZIP 檔案損壞")
 
-    return dfs
+    return parts
+
+
+def write_csv_utf8sig(df: pd.DataFrame, path: Path) -> None:
+    """以 pyarrow 多執行緒寫出 CSV（含 BOM，相容 to_csv 的 utf-8-sig）"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with open(path, "wb") as f:
+        f.write(b"\xef\xbb\xbf")
+        pacsv.write_csv(table, f)
+
+
+def parse_csv_parts(all_parts: list[dict]) -> pd.DataFrame:
+    """
+    將清理後的 CSV 文字區塊合併解析為單一 DataFrame
+
+    相同標題列的區塊串接成一份文字，各只呼叫一次 pd.read_csv，
+    避免為每個 CSV 建立中間 DataFrame 再 concat。每列前加上
+    區塊編號，解析後據此對回來源縣市等中繼資料。各組結果以
+    pyarrow 串接，schema 聯集在 metadata 層完成、缺欄補 null。
+    """
+    # 依標題列分組（不同法規分類的欄位集合可能不同）
+    groups: dict[str, list[dict]] = {}
+    for part in all_parts:
+        groups.setdefault(part["header"], []).append(part)
+
+    group_dfs = []
+    for header, parts in groups.items():
+        buffer = io.StringIO()
+        buffer.write("_part," + header + "\n")
+        for idx, part in enumerate(parts):
+            for line in part["body"].split("\n"):
+                buffer.write(f"{idx},{line}\n")
+
+        buffer.seek(0)
+        df = pd.read_csv(buffer, dtype=str, on_bad_lines="skip")
+
+        part_idx = df["_part"].astype(int)
+        df["來源縣市"] = part_idx.map({i: p["city"] for i, p in enumerate(parts)})
+        df["來源檔案"] = part_idx.map({i: p["filename"] for i, p in enumerate(parts)})
+        df["法規分類"] = part_idx.map({i: p["category"] for i, p in enumerate(parts)})
+        df = df.drop(columns=["_part"])
+        group_dfs.append(df)
+
+    tables = [pa.Table.from_pandas(df, preserve_index=False) for df in group_dfs]
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas()
 
 
 def main():
@@ -203,8 +289,18 @@ def main():
     RAW_DIR.mkdir(parents=True, exist_ok=True)
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
-    # 建立 session
+    # 建立 session（連線池重用 TLS 連線，並自動重試暫時性錯誤）
     session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]
+            ),
+        ),
+    )
     session.headers.update(
         {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -218,47 +314,56 @@ def main():
     print("完成")
     print()
 
-    all_dfs = []
+    all_parts = []
     stats = {}
+    running_total = 0
 
-    for i, (city_name, city_code) in enumerate(CITY_CODES.items(), 1):
-        print(f"[{i}/{len(CITY_CODES)}] 下載 {city_name} ({city_code})...", end=" ")
-
+    def _fetch_one(city_name: str, city_code: str) -> tuple[str, bytes | None]:
+        """下載單一縣市，回傳 (縣市名稱, ZIP 內容)"""
         zip_content = download_city_data(session, csrf_token, city_name, city_code)
+        return city_name, zip_content
 
-        if zip_content:
-            # 儲存原始 ZIP
-            zip_path = RAW_DIR / f"violations_{city_code}_{city_name}.zip"
-            with open(zip_path, "wb") as f:
-                f.write(zip_content)
-
-            # 提取 CSV
-            dfs = extract_csvs_from_zip(zip_content, city_name)
-            total_rows = sum(len(df) for df in dfs)
-            stats[city_name] = total_rows
-            all_dfs.extend(dfs)
-            print(f"取得 {total_rows} 筆 ({len(dfs)} 個 CSV)")
-        else:
-            stats[city_name] = 0
-            print("無資料")
+    # 平行下載（網路 I/O 為瓶頸，執行緒即可重疊等待時間）
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(_fetch_one, city_name, city_code): city_name
+            for city_name, city_code in CITY_CODES.items()
+        }
 
-        # 避免過度請求
-        time.sleep(1)
+        for i, future in enumerate(as_completed(futures), 1):
+            city_name, zip_content = future.result()
+            city_code = CITY_CODES[city_name]
+            print(f"[{i}/{len(CITY_CODES)}] {city_name} ({city_code})...", end=" ")
+
+            if zip_content:
+                # 儲存原始 ZIP
+                zip_path = RAW_DIR / f"violations_{city_code}_{city_name}.zip"
+                with open(zip_path, "wb") as f:
+                    f.write(zip_content)
+
+                # 提取 CSV
+                parts = extract_csvs_from_zip(zip_content, city_name)
+                total_rows = sum(part["rows"] for part in parts)
+                running_total += total_rows
+                stats[city_name] = total_rows
+                all_parts.extend(parts)
+                print(f"取得 {total_rows} 筆 ({len(parts)} 個 CSV)")
+            else:
+                stats[city_name] = 0
+                print("無資料")
 
     print()
-    print(f"總共取得: {sum(len(df) for df in all_dfs)} 筆資料")
+    print(f"總共取得: {running_total} 筆資料")
 
-    if not all_dfs:
+    if not all_parts:
         print("未取得任何資料，結束程式")
         return
 
-    # 合併所有 DataFrame
+    # 合併解析（相同標題列的 CSV 串接後各解析一次）
     print()
     print("合併資料中...")
 
-    # 分類合併（因為不同類別可能有不同欄位）
-    # 根據欄位特徵分類
-    df_all = pd.concat(all_dfs, ignore_index=True)
+    df_all = parse_csv_parts(all_parts)
 
     # 資料清理
     # 移除完全空白的列
@@ -271,8 +376,10 @@ def main():
     df_all = df_all.reset_index(drop=True)
 
     # 匯出合併 CSV
+    # 匯出合併 CSV（另存 Parquet 供下游程式走快速路徑）
     output_file = PROCESSED_DIR / "違反勞動法令_全台彙整.csv"
-    df_all.to_csv(output_file, encoding="utf-8-sig", index=False)
+    write_csv_utf8sig(df_all, output_file)
+    df_all.to_parquet(output_file.with_suffix(".parquet"), compression="zstd", index=False)
 
     print()
     print("=" * 60)
@@ -285,37 +392,42 @@ def main():
     print()
     print("輸出各年度檔案...")
     if "處分日期" in df_all.columns:
-        # 解析民國年 (格式: 114/12/26)
-        def parse_roc_year(date_str):
-            if pd.isna(date_str):
-                return None
-            try:
-                parts = str(date_str).strip().replace("-", "/").split("/")
-                if len(parts) >= 1:
-                    roc_year = int(parts[0])
-                    if roc_year < 200:
-                        return roc_year + 1911
-                    return roc_year
-            except (ValueError, IndexError):
-                pass
-            return None
-
-        df_all["_year"] = df_all["處分日期"].apply(parse_roc_year)
+        # 解析民國年 (格式: 114/12/26)：向量化取第一段數字，民國年再 +1911
+        roc_year = pd.to_numeric(
+            df_all["處分日期"]
+            .astype("string")
+            .str.strip()
+            .str.split(r"[/-]", n=1, regex=True)
+            .str[0],
+            errors="coerce",
+        )
+        years = roc_year.mask(roc_year < 200, roc_year + 1911).astype("Int64")
+        # 年度基數小，轉 category 讓 groupby 一次建好索引，避免逐年全欄掃描
+        df_all["_year"] = years.astype("category")
+
+        def _write_year(year: int, year_df: pd.DataFrame) -> int:
+            year_file = PROCESSED_DIR / f"違反勞動法令_{year}.csv"
+            write_csv_utf8sig(year_df.drop(columns=["_year"]), year_file)
+            return len(year_df)
 
+        # 各年度檔案彼此獨立，平行寫出以吃滿磁碟頻寬
         year_stats = {}
-        for year in sorted(df_all["_year"].dropna().unique()):
-            year = int(year)
-            year_df = df_all[df_all["_year"] == year].drop(columns=["_year"]).copy()
-            year_file = PROCESSED_DIR / f"違反勞動法令_{year}.csv"
-            year_df.to_csv(year_file, encoding="utf-8-sig", index=False)
-            year_stats[year] = len(year_df)
-            print(f"  {year}: {len(year_df)} 筆 → {year_file.name}")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                executor.submit(_write_year, int(year), year_df): int(year)
+                for year, year_df in df_all.groupby("_year", sort=True, observed=True)
+            }
+            for future in as_completed(futures):
+                year_stats[futures[future]] = future.result()
+
+        for year in sorted(year_stats):
+            print(f"  {year}: {year_stats[year]} 筆 → 違反勞動法令_{year}.csv")
 
         # 日期不明的資料
         unknown_df = df_all[df_all["_year"].isna()].drop(columns=["_year"])
         if len(unknown_df) > 0:
             unknown_file = PROCESSED_DIR / "違反勞動法令_日期不明.csv"
-            unknown_df.to_csv(unknown_file, encoding="utf-8-sig", index=False)
+            write_csv_utf8sig(unknown_df, unknown_file)
             print(f"  日期不明: {len(unknown_df)} 筆 → {unknown_file.name}")
 
         # 移除暫時欄位
@@ -6,17 +6,38 @@
 用於與 pacs.osha.gov.tw API 資料比對
 """
 
-import json
-import time
 import urllib3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import orjson
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import RateLimiter
 
 # 關閉 SSL 警告（台灣政府網站憑證設定問題）
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# 請求速率限制（每秒最多 3 次，跨執行緒共用）
+_LIMITER = RateLimiter(rate=3, per=1.0)
+
+# 共用 Session（連線池重用 TLS 連線，並自動重試暫時性錯誤）
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+    ),
+)
+
+# 分頁下載併發數
+MAX_WORKERS = 8
+
 # 設定
 BASE_URL = "https://apiservice.mol.gov.tw/OdService/rest/datastore"
 BASE_DIR = Path(__file__).parent.parent
@@ -35,7 +56,9 @@ RESOURCE_IDS = {
 }
 
 
-def fetch_data(resource_id: str, limit: int = 1000, offset: int = 0) -> list:
+def fetch_data(
+    resource_id: str, limit: int = 1000, offset: int = 0
+) -> tuple[list, int]:
     """
     從勞動部 WEBSERVICES API 取得資料
 
@@ -45,22 +68,26 @@ def fetch_data(resource_id: str, limit: int = 1000, offset: int = 0) -> list:
         offset: 起始位置
 
     Returns:
-        資料列表
+        (資料列表, 資料總筆數)
     """
     url = f"{BASE_URL}/{resource_id}"
     params = {"limit": limit, "offset": offset}
 
     try:
-        response = requests.get(url, params=params, timeout=30, verify=False)
+        _LIMITER.acquire()
+        response = _SESSION.get(url, params=params, timeout=30, verify=False)
         response.raise_for_status()
         data = response.json()
 
         if data.get("success") and "result" in data:
-            return data["result"].get("records", [])
-        return []
+            result = data["result"]
+            records = result.get("records", [])
+            total = int(result.get("total", len(records)))
+            return records, total
+        return [], 0
     except requests.RequestException as e:
         print(f"  錯誤: {e}")
-        return []
+        return [], 0
 
 
 def fetch_all_data(resource_id: str) -> list:
@@ -73,23 +100,21 @@ def fetch_all_data(resource_id: str) -> list:
     Returns:
         完整資料列表
     """
-    all_data = []
-    offset = 0
     limit = 1000
 
-    while True:
-        data = fetch_data(resource_id, limit=limit, offset=offset)
-        if not data:
-            break
-
-        all_data.extend(data)
+    # 先查詢第一頁取得總筆數，再平行下載其餘分頁
+    all_data, total = fetch_data(resource_id, limit=limit, offset=0)
 
-        # 如果取得的資料少於 limit，表示已經沒有更多資料
-        if len(data) < limit:
-            break
+    if total <= limit:
+        return all_data
 
-        offset += limit
-        time.sleep(0.3)
+    offsets = range(limit, total, limit)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for records, _ in executor.map(
+            lambda offset: fetch_data(resource_id, limit=limit, offset=offset),
+            offsets,
+        ):
+            all_data.extend(records)
 
     return all_data
 
@@ -97,8 +122,8 @@ def fetch_all_data(resource_id: str) -> list:
 def save_raw_json(data: list, year: str) -> None:
     """儲存原始 JSON 資料"""
     filename = RAW_DIR / f"mol_{year}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 
 def main():
@@ -133,8 +158,6 @@ def main():
                     record["年度"] = year if year != "latest" else "最新"
             all_data.extend(data)
 
-        time.sleep(0.5)
-
     print()
     print(f"總共取得: {len(all_data)} 筆資料")
 
@@ -169,9 +192,10 @@ def main():
     df.index = df.index + 1
     df.index.name = "編號"
 
-    # 匯出 CSV
+    # 匯出 CSV（另存 Parquet 供下游程式走快速路徑）
     output_file = PROCESSED_DIR / "重大職業災害_MOL_WEBSERVICES.csv"
     df.to_csv(output_file, encoding="utf-8-sig")
+    df.to_parquet(output_file.with_suffix(".parquet"), compression="zstd")
 
     print()
     print("=" * 60)
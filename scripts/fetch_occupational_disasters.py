@@ -7,17 +7,34 @@ API 限制: 單次查詢上限 200 筆
 策略: 按半年分批查詢，確保完整取得所有資料
 """
 
-import json
-import time
 import urllib3
 from pathlib import Path
 
+import orjson
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import RateLimiter
 
 # 關閉 SSL 警告（台灣政府網站憑證設定問題）
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# 請求速率限制（每秒最多 3 次）
+_LIMITER = RateLimiter(rate=3, per=1.0)
+
+# 共用 Session（連線池重用 TLS 連線，並自動重試暫時性錯誤）
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+    ),
+)
+
 # 設定
 API_URL = "https://pacs.osha.gov.tw/api/v1/getdangerocupation"
 BASE_DIR = Path(__file__).parent.parent
@@ -62,7 +79,8 @@ def fetch_data(start_date: str, end_date: str) -> list:
     }
 
     try:
-        response = requests.get(API_URL, params=params, timeout=30, verify=False)
+        _LIMITER.acquire()
+        response = _SESSION.get(API_URL, params=params, timeout=30, verify=False)
         response.raise_for_status()
         data = response.json()
         return data if isinstance(data, list) else []
@@ -74,8 +92,8 @@ def fetch_data(start_date: str, end_date: str) -> list:
 def save_raw_json(data: list, start_date: str, end_date: str) -> None:
     """儲存原始 JSON 資料"""
     filename = RAW_DIR / f"disasters_{start_date}_{end_date}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
 
 def main():
@@ -104,9 +122,6 @@ def main():
             save_raw_json(data, start_date, end_date)
             all_data.extend(data)
 
-        # 避免過度請求
-        time.sleep(0.5)
-
     print()
     print(f"總共取得: {len(all_data)} 筆資料")
 
@@ -141,9 +156,10 @@ def main():
     df.index = df.index + 1
     df.index.name = "編號"
 
-    # 匯出合併 CSV
+    # 匯出合併 CSV（另存 Parquet 供下游程式走快速路徑）
     output_file = PROCESSED_DIR / "重大職業災害_2018至今.csv"
     df.to_csv(output_file, encoding="utf-8-sig")
+    df.to_parquet(output_file.with_suffix(".parquet"), compression="zstd")
 
     print()
     print("=" * 60)
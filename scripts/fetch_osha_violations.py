@@ -6,15 +6,31 @@
 API: https://apiservice.mol.gov.tw/OdService/download/A17000000J-030466-h0a
 """
 
+import os
+import tempfile
 import urllib3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # 關閉 SSL 警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# 共用 Session（連線池重用 TLS 連線，並自動重試暫時性錯誤）
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+    ),
+)
+
 # 設定
 DOWNLOAD_URL = "https://apiservice.mol.gov.tw/OdService/download/A17000000J-030466-h0a"
 BASE_DIR = Path(__file__).parent.parent
@@ -22,31 +38,36 @@ PROCESSED_DIR = BASE_DIR / "data" / "processed"
 
 
 def download_csv() -> pd.DataFrame:
-    """下載 CSV 資料"""
+    """下載 CSV 資料（串流寫入暫存檔，避免整份回應載入記憶體）"""
     print(f"下載資料: {DOWNLOAD_URL}")
 
-    response = requests.get(DOWNLOAD_URL, timeout=120, verify=False)
-    response.raise_for_status()
-
-    # 解析 CSV
-    from io import StringIO
+    with _SESSION.get(DOWNLOAD_URL, stream=True, timeout=120, verify=False) as response:
+        response.raise_for_status()
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tf:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                tf.write(chunk)
+            tmp_path = tf.name
 
-    df = pd.read_csv(StringIO(response.text), encoding="utf-8")
+    try:
+        # 處分日期固定為 YYYYMMDD，指定型別跳過推斷、避免被升為 float
+        df = pd.read_csv(
+            tmp_path,
+            encoding="utf-8-sig",
+            engine="pyarrow",
+            dtype={"處分日期": "string"},
+        )
+    finally:
+        os.unlink(tmp_path)
 
     return df
 
 
-def parse_year(date_val) -> int | None:
-    """從 YYYYMMDD 格式解析年份"""
-    if pd.isna(date_val):
-        return None
-    try:
-        date_str = str(int(date_val))
-        if len(date_str) >= 4:
-            return int(date_str[:4])
-    except (ValueError, TypeError):
-        pass
-    return None
+def parse_year(dates: pd.Series) -> pd.Series:
+    """從 YYYYMMDD 格式解析年份（向量化處理整個 Series）"""
+    numeric = pd.to_numeric(dates, errors="coerce")
+    return pd.to_numeric(
+        numeric.astype("Int64").astype(str).str.slice(0, 4), errors="coerce"
+    ).astype("Int64")
 
 
 def main():
@@ -78,9 +99,10 @@ def main():
     if "處分日期" in df.columns:
         df = df.sort_values("處分日期", ascending=False)
 
-    # 匯出合併 CSV
+    # 匯出合併 CSV（另存 Parquet 供下游程式走快速路徑）
     output_file = PROCESSED_DIR / "違反職安法令_全部.csv"
     df.to_csv(output_file, encoding="utf-8-sig", index=False)
+    df.to_parquet(output_file.with_suffix(".parquet"), compression="zstd", index=False)
 
     print("=" * 60)
     print("完成!")
@@ -93,16 +115,28 @@ def main():
     print("輸出各年度檔案...")
 
     if "處分日期" in df.columns:
-        df["_year"] = df["處分日期"].apply(parse_year)
+        # 年度基數小，轉 category 讓 groupby 一次建好索引，避免逐年全欄掃描
+        df["_year"] = parse_year(df["處分日期"]).astype("category")
 
-        year_stats = {}
-        for year in sorted(df["_year"].dropna().unique()):
-            year = int(year)
-            year_df = df[df["_year"] == year].drop(columns=["_year"]).copy()
+        def _write_year(year: int, year_df: pd.DataFrame) -> int:
             year_file = PROCESSED_DIR / f"違反職安法令_{year}.csv"
-            year_df.to_csv(year_file, encoding="utf-8-sig", index=False)
-            year_stats[year] = len(year_df)
-            print(f"  {year}: {len(year_df)} 筆 → {year_file.name}")
+            year_df.drop(columns=["_year"]).to_csv(
+                year_file, encoding="utf-8-sig", index=False
+            )
+            return len(year_df)
+
+        # 各年度檔案彼此獨立，平行寫出以吃滿磁碟頻寬
+        year_stats = {}
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                executor.submit(_write_year, int(year), year_df): int(year)
+                for year, year_df in df.groupby("_year", sort=True, observed=True)
+            }
+            for future in as_completed(futures):
+                year_stats[futures[future]] = future.result()
+
+        for year in sorted(year_stats):
+            print(f"  {year}: {year_stats[year]} 筆 → 違反職安法令_{year}.csv")
 
         # 日期不明
         unknown = df[df["_year"].isna()].drop(columns=["_year"])
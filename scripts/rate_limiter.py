@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Token bucket 速率限制器，供各下載腳本共用
+
+固定 time.sleep 不論伺服器回應快慢都付出等待時間；token bucket
+只在額度用完時才等待補充，快的回應可以連發、慢的回應自然消耗額度。
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket 速率限制器（執行緒安全）
+
+    Args:
+        rate: 每個時間窗允許的請求數
+        per: 時間窗長度（秒）
+    """
+
+    def __init__(self, rate: int = 3, per: float = 1.0):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """取得一個 token，額度不足時等待補充"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(self.rate),
+                    self._tokens + (now - self._updated) * (self.rate / self.per),
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) * (self.per / self.rate)
+
+            time.sleep(wait)